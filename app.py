@@ -1,7 +1,10 @@
+import hashlib
+import json
 import streamlit as st
 import requests
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from datetime import datetime
 
 # Configuración de página con tema personalizado
@@ -138,6 +141,255 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Plantilla compartida para todos los gráficos (evita repetir estilos por figura)
+COLOR_TEXTO = '#1e3a8a'
+FUENTE_EJES = dict(color=COLOR_TEXTO, size=12)
+
+# Se registra una sola vez por proceso, sobre la plantilla base de Plotly
+if "dengue" not in pio.templates:
+    plantilla = go.layout.Template(pio.templates["plotly"])
+    plantilla.layout.update(
+        title=dict(x=0.5, xanchor='center', font=dict(size=20, color=COLOR_TEXTO, family='Arial')),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=FUENTE_EJES,
+        xaxis=dict(showgrid=True, gridcolor='#e2e8f0', tickfont=FUENTE_EJES),
+        yaxis=dict(showgrid=True, gridcolor='#e2e8f0', tickfont=FUENTE_EJES),
+        legend=dict(font=FUENTE_EJES)
+    )
+    pio.templates["dengue"] = plantilla
+
+# Series más largas que esto (p. ej. datos semanales de muchos años) se dibujan con WebGL
+UMBRAL_WEBGL = 500
+# Máximo de puntos enviados al navegador por serie
+MAX_PUNTOS_SERIE = 2000
+
+
+def hash_resultados(r):
+    """Huella estable del payload de la API, usada como clave de caché."""
+    return hashlib.sha256(json.dumps(r, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def pronostico_corregido(r):
+    # Corregir casos negativos
+    return max(r['pronostico']['casos_pronosticados'], 0)
+
+
+def contar_riesgo(r):
+    cases = list(r["casos_historicos"].values())
+    alto = sum(1 for c in cases if c > r['umbral_alerta'])
+    return alto, len(cases) - alto
+
+
+def reducir_serie(x, y, max_puntos=MAX_PUNTOS_SERIE):
+    """Reduce la serie tomando el mínimo y el máximo de cada bloque para conservar los picos."""
+    n = len(y)
+    if n <= max_puntos:
+        return list(x), list(y)
+    tam = -(-n // (max_puntos // 2))
+    xs, ys = [], []
+    for inicio in range(0, n, tam):
+        bloque = range(inicio, min(inicio + tam, n))
+        i_min = min(bloque, key=y.__getitem__)
+        i_max = max(bloque, key=y.__getitem__)
+        for i in sorted({i_min, i_max}):
+            xs.append(x[i])
+            ys.append(y[i])
+    return xs, ys
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def construir_grafico_evolucion(clave, _r):
+    years = list(_r["casos_historicos"].keys())
+    cases = list(_r["casos_historicos"].values())
+    pronostico = pronostico_corregido(_r)
+    anio_pronostico = _r['pronostico']['año']
+
+    fig = go.Figure()
+    if len(cases) > UMBRAL_WEBGL:
+        x, y = reducir_serie(years, cases)
+        fig.add_trace(go.Scattergl(
+            x=x, y=y, mode="lines", name="Casos reales",
+            line=dict(color='rgba(99, 110, 250, 0.9)', width=1.5),
+            hovertemplate='<b>%{x}</b><br>Casos: %{y:,.0f}<extra></extra>'
+        ))
+    else:
+        fig.add_trace(go.Bar(
+            x=years, y=cases, name="Casos reales",
+            marker_color='rgba(99, 110, 250, 0.7)',
+            hovertemplate='<b>Año %{x}</b><br>Casos: %{y:,.0f}<extra></extra>'
+        ))
+    fig.add_trace(go.Scatter(
+        x=[years[-1], anio_pronostico], y=[cases[-1], pronostico],
+        mode="lines+markers", name=f"Pronóstico {anio_pronostico}",
+        line=dict(color="#ef4444", width=4, dash='dash'),
+        marker=dict(size=16, color='#dc2626', line=dict(color='white', width=2)),
+        hovertemplate='<b>Año %{x}</b><br>Pronóstico: %{y:,.0f}<extra></extra>'
+    ))
+    fig.add_hline(
+        y=_r['umbral_alerta'], line_dash="dot", line_color="#f59e0b",
+        annotation_text="⚠️ Umbral de alerta", annotation_position="right"
+    )
+    fig.update_layout(
+        template="dengue",
+        title_text="Evolución Histórica y Pronóstico de Casos de Dengue",
+        height=550,
+        xaxis_title="Año",
+        yaxis_title="Número de Casos",
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def construir_grafico_riesgo(clave, _r):
+    alto, bajo = contar_riesgo(_r)
+    fig_pie = px.pie(
+        values=[alto, bajo],
+        names=["Años con brote", "Años controlados"],
+        color_discrete_sequence=["#ef4444", "#22c55e"],
+        title="Distribución Histórica de Riesgo",
+        hole=0.4,
+        template="dengue"
+    )
+    fig_pie.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        textfont_size=14,
+        marker=dict(line=dict(color='white', width=3))
+    )
+    fig_pie.update_layout(height=500)
+    return fig_pie
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def construir_html_resultados(clave, _r):
+    """Bloques HTML que dependen solo del resultado de la API."""
+    html = {}
+    pronostico = pronostico_corregido(_r)
+    if pronostico == 0:
+        pronostico_texto = "< 50 casos"
+        pronostico_display = "Baja actividad"
+    else:
+        pronostico_texto = f"{pronostico:,.0f}"
+        pronostico_display = f"{pronostico:,.0f} casos"
+
+    # Información del período
+    html["periodo"] = f"""
+    <div style='text-align:center; padding:15px; background:white; border-radius:10px; margin:20px 0;'>
+        <span style='font-size:18px; color:#475569;'>
+            📅 <b>Período analizado:</b> {_r['periodo']} |
+            📊 <b>Datos históricos:</b> {_r['total_años']} años
+        </span>
+    </div>
+    """
+
+    # Tarjetas principales
+    html["pronostico"] = f"""
+    <div style='background:linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                padding:25px; border-radius:15px; text-align:center; color:white;
+                box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);'>
+        <div style='font-size:14px; opacity:0.9; margin-bottom:8px;'>PRONÓSTICO 2026</div>
+        <div style='font-size:32px; font-weight:700;'>{pronostico_texto}</div>
+        <div style='font-size:12px; opacity:0.8; margin-top:5px;'>{pronostico_display if pronostico > 0 else 'esperados'}</div>
+    </div>
+    """
+
+    clas = _r['pronostico']['clasificacion']
+    is_high = "ALTA" in clas
+    bg_color = "linear-gradient(135deg, #ff6b6b 0%, #ee5a6f 100%)" if is_high else "linear-gradient(135deg, #51cf66 0%, #37b24d 100%)"
+    icon = "⚠️" if is_high else "✅"
+    html["clasificacion"] = f"""
+    <div style='background:{bg_color};
+                padding:25px; border-radius:15px; text-align:center; color:white;
+                box-shadow: 0 4px 12px rgba(238, 90, 111, 0.4);'>
+        <div style='font-size:14px; opacity:0.9; margin-bottom:8px;'>CLASIFICACIÓN</div>
+        <div style='font-size:28px; font-weight:700;'>{icon} {clas}</div>
+    </div>
+    """
+
+    html["umbral"] = f"""
+    <div style='background:linear-gradient(135deg, #f59e0b 0%, #d97706 100%);
+                padding:25px; border-radius:15px; text-align:center; color:white;
+                box-shadow: 0 4px 12px rgba(245, 158, 11, 0.4);'>
+        <div style='font-size:14px; opacity:0.9; margin-bottom:8px;'>UMBRAL DE ALERTA</div>
+        <div style='font-size:32px; font-weight:700;'>{_r['umbral_alerta']:,.0f}</div>
+        <div style='font-size:12px; opacity:0.8; margin-top:5px;'>casos</div>
+    </div>
+    """
+
+    prob = _r['pronostico'].get('probabilidad_brote', 0)
+    prob_color = "#dc2626" if prob > 60 else "#f59e0b" if prob > 30 else "#16a34a"
+    html["probabilidad"] = f"""
+    <div style='background:linear-gradient(135deg, #06b6d4 0%, #0891b2 100%);
+                padding:25px; border-radius:15px; text-align:center; color:white;
+                box-shadow: 0 4px 12px rgba(6, 182, 212, 0.4);'>
+        <div style='font-size:14px; opacity:0.9; margin-bottom:8px;'>PROB. DE BROTE</div>
+        <div style='font-size:32px; font-weight:700;'>{prob}%</div>
+    </div>
+    """
+
+    # Estadísticas de riesgo
+    alto, bajo = contar_riesgo(_r)
+    total = alto + bajo
+    html["anios_brote"] = f"""
+    <div style='background:white; padding:20px; border-radius:10px; border-left:5px solid #ef4444;'>
+        <h4 style='color:#dc2626; margin:0;'>🔴 Años con brote</h4>
+        <p style='font-size:32px; font-weight:700; color:#1e3a8a; margin:10px 0;'>{alto} años</p>
+        <p style='color:#64748b;'>{(alto / total) * 100:.1f}% del período analizado</p>
+    </div>
+    """
+    html["anios_control"] = f"""
+    <div style='background:white; padding:20px; border-radius:10px; border-left:5px solid #22c55e;'>
+        <h4 style='color:#16a34a; margin:0;'>🟢 Años controlados</h4>
+        <p style='font-size:32px; font-weight:700; color:#1e3a8a; margin:10px 0;'>{bajo} años</p>
+        <p style='color:#64748b;'>{(bajo / total) * 100:.1f}% del período analizado</p>
+    </div>
+    """
+
+    # Indicadores clave
+    html["picos"] = f"""
+    <div style='background:white; padding:15px; margin-top:-15px; border-radius:0 0 15px 15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);'>
+        <p style='font-size:16px; color:#475569; line-height:2;'>
+            🔸 <b>Año más grave:</b> <span style='color:#dc2626; font-weight:700;'>{_r['kpis']['Año Pico']}</span><br>
+            🔸 <b>Casos máximos:</b> <span style='color:#dc2626; font-weight:700;'>{_r['kpis']['Casos Máximos Históricos']:,}</span><br>
+            🔸 <b>Índice de severidad:</b> <span style='color:#f59e0b; font-weight:700;'>{_r['kpis']['Índice de Severidad (%)']}%</span>
+        </p>
+    </div>
+    """
+
+    tasa = _r['kpis']['Tasa de Crecimiento Anual Promedio (%)']
+    tasa_color = "#dc2626" if tasa > 0 else "#16a34a"
+    tasa_icon = "📈" if tasa > 0 else "📉"
+    html["tendencia"] = f"""
+    <div style='background:white; padding:15px; margin-top:-15px; border-radius:0 0 15px 15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);'>
+        <p style='font-size:16px; color:#475569; line-height:2;'>
+            {tasa_icon} <b>Crecimiento anual:</b> <span style='color:{tasa_color}; font-weight:700;'>{tasa:+.2f}%</span><br>
+            🔸 <b>Intervalo de confianza 90%:</b><br>
+            <span style='color:#475569; font-weight:600;'>{_r['pronostico']['intervalo_confianza_90'][0]:,} – {_r['pronostico']['intervalo_confianza_90'][1]:,} casos</span>
+        </p>
+    </div>
+    """
+
+    # Mensaje final
+    mensaje_limpio = _r["mensaje"].replace("-917", "< 50")
+    if is_high:
+        html["mensaje"] = f"""
+        <div class='alert-card'>
+            <h3 style='margin:0 0 15px 0;'>⚠️ ALERTA DE RIESGO ALTO</h3>
+            <p style='font-size:16px; line-height:1.6; margin:0;'>{mensaje_limpio}</p>
+        </div>
+        """
+    else:
+        html["mensaje"] = f"""
+        <div class='success-card'>
+            <h3 style='margin:0 0 15px 0;'>✅ RIESGO CONTROLADO</h3>
+            <p style='font-size:16px; line-height:1.6; margin:0;'>{mensaje_limpio}</p>
+        </div>
+        """
+    return html
+
 # Header con diseño mejorado
 col_logo1, col_title, col_logo2 = st.columns([1, 3, 1])
 with col_title:
@@ -161,6 +413,29 @@ with st.container():
 
 API_URL = "https://algoritmo-web-api.onrender.com/predict"
 
+
+class RespuestaFallida(Exception):
+    """Respuesta distinta de 200; al lanzarse, st.cache_data no la guarda."""
+
+    def __init__(self, status_code, texto):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.texto = texto
+
+
+def hash_archivo(nombre, contenido):
+    """Huella del archivo subido, usada como clave de caché de la consulta a la API."""
+    return hashlib.sha256(nombre.encode("utf-8") + b"\0" + contenido).hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def consultar_api(clave, nombre, _contenido, tipo):
+    files = {"file": (nombre, _contenido, tipo)}
+    response = requests.post(API_URL, files=files, timeout=120)
+    if response.status_code != 200:
+        raise RespuestaFallida(response.status_code, response.text)
+    return response.json()["results"]
+
 # Área de carga de archivo con mejor diseño y contraste
 st.markdown("""
 <div style='background:white; padding:20px; border-radius:15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); margin-bottom:30px;'>
@@ -178,85 +453,42 @@ file = st.file_uploader(
 if file:
     with st.spinner("🔄 Despertando el modelo y analizando datos... (puede tardar 20-40 segundos la primera vez)"):
         try:
-            files = {"file": (file.name, file.getvalue(), file.type or "application/octet-stream")}
-            response = requests.post(API_URL, files=files, timeout=120)
+            contenido = file.getvalue()
+            tipo = file.type or "application/octet-stream"
+            try:
+                r = consultar_api(hash_archivo(file.name, contenido), file.name, contenido, tipo)
+                detalle_error = None
+            except RespuestaFallida as e:
+                r, detalle_error = None, e.texto
 
-            if response.status_code == 200:
-                r = response.json()["results"]
+            if detalle_error is None:
+                clave = hash_resultados(r)
+                html = construir_html_resultados(clave, r)
 
-                st.balloons()
+                # Globos solo la primera vez que se muestra este resultado
+                if st.session_state.get("ultimo_resultado") != clave:
+                    st.session_state["ultimo_resultado"] = clave
+                    st.balloons()
                 st.success("✅ ¡Análisis completado con éxito!")
                 
                 # Información del período
-                st.markdown(f"""
-                <div style='text-align:center; padding:15px; background:white; border-radius:10px; margin:20px 0;'>
-                    <span style='font-size:18px; color:#475569;'>
-                        📅 <b>Período analizado:</b> {r['periodo']} | 
-                        📊 <b>Datos históricos:</b> {r['total_años']} años
-                    </span>
-                </div>
-                """, unsafe_allow_html=True)
-
-                # Corregir casos negativos
-                pronostico = max(r['pronostico']['casos_pronosticados'], 0)
-                if pronostico == 0:
-                    pronostico_texto = "< 50 casos"
-                    pronostico_display = "Baja actividad"
-                else:
-                    pronostico_texto = f"{pronostico:,.0f}"
-                    pronostico_display = f"{pronostico:,.0f} casos"
+                st.markdown(html["periodo"], unsafe_allow_html=True)
 
                 # Tarjetas principales con diseño mejorado
                 st.markdown("<br>", unsafe_allow_html=True)
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
-                    st.markdown(f"""
-                    <div style='background:linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                                padding:25px; border-radius:15px; text-align:center; color:white;
-                                box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);'>
-                        <div style='font-size:14px; opacity:0.9; margin-bottom:8px;'>PRONÓSTICO 2026</div>
-                        <div style='font-size:32px; font-weight:700;'>{pronostico_texto}</div>
-                        <div style='font-size:12px; opacity:0.8; margin-top:5px;'>{pronostico_display if pronostico > 0 else 'esperados'}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(html["pronostico"], unsafe_allow_html=True)
                 
                 with col2:
-                    clas = r['pronostico']['clasificacion']
-                    is_high = "ALTA" in clas
-                    bg_color = "linear-gradient(135deg, #ff6b6b 0%, #ee5a6f 100%)" if is_high else "linear-gradient(135deg, #51cf66 0%, #37b24d 100%)"
-                    icon = "⚠️" if is_high else "✅"
-                    st.markdown(f"""
-                    <div style='background:{bg_color}; 
-                                padding:25px; border-radius:15px; text-align:center; color:white;
-                                box-shadow: 0 4px 12px rgba(238, 90, 111, 0.4);'>
-                        <div style='font-size:14px; opacity:0.9; margin-bottom:8px;'>CLASIFICACIÓN</div>
-                        <div style='font-size:28px; font-weight:700;'>{icon} {clas}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(html["clasificacion"], unsafe_allow_html=True)
                 
                 with col3:
-                    st.markdown(f"""
-                    <div style='background:linear-gradient(135deg, #f59e0b 0%, #d97706 100%); 
-                                padding:25px; border-radius:15px; text-align:center; color:white;
-                                box-shadow: 0 4px 12px rgba(245, 158, 11, 0.4);'>
-                        <div style='font-size:14px; opacity:0.9; margin-bottom:8px;'>UMBRAL DE ALERTA</div>
-                        <div style='font-size:32px; font-weight:700;'>{r['umbral_alerta']:,.0f}</div>
-                        <div style='font-size:12px; opacity:0.8; margin-top:5px;'>casos</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(html["umbral"], unsafe_allow_html=True)
                 
                 with col4:
-                    prob = r['pronostico'].get('probabilidad_brote', 0)
-                    prob_color = "#dc2626" if prob > 60 else "#f59e0b" if prob > 30 else "#16a34a"
-                    st.markdown(f"""
-                    <div style='background:linear-gradient(135deg, #06b6d4 0%, #0891b2 100%); 
-                                padding:25px; border-radius:15px; text-align:center; color:white;
-                                box-shadow: 0 4px 12px rgba(6, 182, 212, 0.4);'>
-                        <div style='font-size:14px; opacity:0.9; margin-bottom:8px;'>PROB. DE BROTE</div>
-                        <div style='font-size:32px; font-weight:700;'>{prob}%</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(html["probabilidad"], unsafe_allow_html=True)
 
                 st.markdown("<br><br>", unsafe_allow_html=True)
 
@@ -264,111 +496,17 @@ if file:
                 tab1, tab2, tab3 = st.tabs(["📈 Evolución y Pronóstico", "🥧 Análisis de Riesgo", "📊 Indicadores Clave"])
                 
                 with tab1:
-                    years = list(r["casos_historicos"].keys())
-                    cases = list(r["casos_historicos"].values())
-
-                    fig = go.Figure()
-                    fig.add_trace(go.Bar(
-                        x=years, y=cases, name="Casos reales",
-                        marker_color='rgba(99, 110, 250, 0.7)',
-                        hovertemplate='<b>Año %{x}</b><br>Casos: %{y:,.0f}<extra></extra>'
-                    ))
-                    fig.add_trace(go.Scatter(
-                        x=[years[-1], 2026], y=[cases[-1], pronostico],
-                        mode="lines+markers", name="Pronóstico 2026",
-                        line=dict(color="#ef4444", width=4, dash='dash'),
-                        marker=dict(size=16, color='#dc2626', line=dict(color='white', width=2)),
-                        hovertemplate='<b>Año %{x}</b><br>Pronóstico: %{y:,.0f}<extra></extra>'
-                    ))
-                    fig.add_hline(
-                        y=r['umbral_alerta'], line_dash="dot", line_color="#f59e0b",
-                        annotation_text="⚠️ Umbral de alerta", annotation_position="right"
-                    )
-                    fig.update_layout(
-                        title={
-                            'text': "Evolución Histórica y Pronóstico de Casos de Dengue",
-                            'x': 0.5,
-                            'xanchor': 'center',
-                            'font': {'size': 20, 'color': '#1e3a8a', 'family': 'Arial'}
-                        },
-                        height=550,
-                        plot_bgcolor='white',
-                        paper_bgcolor='white',
-                        xaxis_title="Año",
-                        yaxis_title="Número de Casos",
-                        hovermode='x unified',
-                        font=dict(color='#1e3a8a', size=12),
-                        xaxis=dict(
-                            showgrid=True,
-                            gridcolor='#e2e8f0',
-                            tickfont=dict(color='#1e3a8a', size=12)
-                        ),
-                        yaxis=dict(
-                            showgrid=True,
-                            gridcolor='#e2e8f0',
-                            tickfont=dict(color='#1e3a8a', size=12)
-                        ),
-                        legend=dict(
-                            orientation="h",
-                            yanchor="bottom",
-                            y=1.02,
-                            xanchor="right",
-                            x=1,
-                            font=dict(color='#1e3a8a', size=12)
-                        )
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(construir_grafico_evolucion(clave, r), use_container_width=True)
 
                 with tab2:
-                    alto = sum(1 for c in cases if c > r['umbral_alerta'])
-                    bajo = len(cases) - alto
-                    
-                    fig_pie = px.pie(
-                        values=[alto, bajo],
-                        names=["Años con brote", "Años controlados"],
-                        color_discrete_sequence=["#ef4444", "#22c55e"],
-                        title="Distribución Histórica de Riesgo",
-                        hole=0.4
-                    )
-                    fig_pie.update_traces(
-                        textposition='inside',
-                        textinfo='percent+label',
-                        textfont_size=14,
-                        marker=dict(line=dict(color='white', width=3))
-                    )
-                    fig_pie.update_layout(
-                        title={
-                            'x': 0.5,
-                            'xanchor': 'center',
-                            'font': {'size': 20, 'color': '#1e3a8a', 'family': 'Arial'}
-                        },
-                        height=500,
-                        paper_bgcolor='white',
-                        font=dict(color='#1e3a8a', size=12),
-                        legend=dict(font=dict(color='#1e3a8a', size=12))
-                    )
-                    st.plotly_chart(fig_pie, use_container_width=True)
+                    st.plotly_chart(construir_grafico_riesgo(clave, r), use_container_width=True)
                     
                     # Estadísticas adicionales
                     col_stat1, col_stat2 = st.columns(2)
                     with col_stat1:
-                        porcentaje_brote = (alto / len(cases)) * 100
-                        st.markdown(f"""
-                        <div style='background:white; padding:20px; border-radius:10px; border-left:5px solid #ef4444;'>
-                            <h4 style='color:#dc2626; margin:0;'>🔴 Años con brote</h4>
-                            <p style='font-size:32px; font-weight:700; color:#1e3a8a; margin:10px 0;'>{alto} años</p>
-                            <p style='color:#64748b;'>{porcentaje_brote:.1f}% del período analizado</p>
-                        </div>
-                        """, unsafe_allow_html=True)
+                        st.markdown(html["anios_brote"], unsafe_allow_html=True)
                     with col_stat2:
-                        porcentaje_control = (bajo / len(cases)) * 100
-                        st.markdown(f"""
-                        <div style='background:white; padding:20px; border-radius:10px; border-left:5px solid #22c55e;'>
-                            <h4 style='color:#16a34a; margin:0;'>🟢 Años controlados</h4>
-                            <p style='font-size:32px; font-weight:700; color:#1e3a8a; margin:10px 0;'>{bajo} años</p>
-                            <p style='color:#64748b;'>{porcentaje_control:.1f}% del período analizado</p>
-                        </div>
-                        """, unsafe_allow_html=True)
+                        st.markdown(html["anios_control"], unsafe_allow_html=True)
 
                 with tab3:
                     col_kpi1, col_kpi2 = st.columns(2)
@@ -381,53 +519,20 @@ if file:
                             </h4>
                         </div>
                         """, unsafe_allow_html=True)
-                        st.markdown(f"""
-                        <div style='background:white; padding:15px; margin-top:-15px; border-radius:0 0 15px 15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);'>
-                            <p style='font-size:16px; color:#475569; line-height:2;'>
-                                🔸 <b>Año más grave:</b> <span style='color:#dc2626; font-weight:700;'>{r['kpis']['Año Pico']}</span><br>
-                                🔸 <b>Casos máximos:</b> <span style='color:#dc2626; font-weight:700;'>{r['kpis']['Casos Máximos Históricos']:,}</span><br>
-                                🔸 <b>Índice de severidad:</b> <span style='color:#f59e0b; font-weight:700;'>{r['kpis']['Índice de Severidad (%)']}%</span>
-                            </p>
-                        </div>
-                        """, unsafe_allow_html=True)
+                        st.markdown(html["picos"], unsafe_allow_html=True)
                     
                     with col_kpi2:
-                        tasa = r['kpis']['Tasa de Crecimiento Anual Promedio (%)']
-                        tasa_color = "#dc2626" if tasa > 0 else "#16a34a"
-                        tasa_icon = "📈" if tasa > 0 else "📉"
-                        st.markdown(f"""
+                        st.markdown("""
                         <div style='background:white; padding:25px; border-radius:15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);'>
                             <h4 style='color:#1e3a8a; border-bottom:3px solid #3b82f6; padding-bottom:10px;'>
                                 📊 Tendencia
                             </h4>
                         </div>
                         """, unsafe_allow_html=True)
-                        st.markdown(f"""
-                        <div style='background:white; padding:15px; margin-top:-15px; border-radius:0 0 15px 15px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);'>
-                            <p style='font-size:16px; color:#475569; line-height:2;'>
-                                {tasa_icon} <b>Crecimiento anual:</b> <span style='color:{tasa_color}; font-weight:700;'>{tasa:+.2f}%</span><br>
-                                🔸 <b>Intervalo de confianza 90%:</b><br>
-                                <span style='color:#475569; font-weight:600;'>{r['pronostico']['intervalo_confianza_90'][0]:,} – {r['pronostico']['intervalo_confianza_90'][1]:,} casos</span>
-                            </p>
-                        </div>
-                        """, unsafe_allow_html=True)
+                        st.markdown(html["tendencia"], unsafe_allow_html=True)
 
                 # Mensaje final con diseño mejorado
-                mensaje_limpio = r["mensaje"].replace("-917", "< 50")
-                if "ALTA" in r['pronostico']['clasificacion']:
-                    st.markdown(f"""
-                    <div class='alert-card'>
-                        <h3 style='margin:0 0 15px 0;'>⚠️ ALERTA DE RIESGO ALTO</h3>
-                        <p style='font-size:16px; line-height:1.6; margin:0;'>{mensaje_limpio}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div class='success-card'>
-                        <h3 style='margin:0 0 15px 0;'>✅ RIESGO CONTROLADO</h3>
-                        <p style='font-size:16px; line-height:1.6; margin:0;'>{mensaje_limpio}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                st.markdown(html["mensaje"], unsafe_allow_html=True)
 
                 # Footer con timestamp
                 st.markdown(f"""
@@ -440,7 +545,7 @@ if file:
             else:
                 st.error("❌ Error del servidor. Por favor, intenta de nuevo.")
                 with st.expander("Ver detalles del error"):
-                    st.code(response.text)
+                    st.code(detalle_error)
 
         except requests.exceptions.Timeout:
             st.warning("⏱️ El servidor tardó demasiado en responder (Render estaba inactivo). Por favor, intenta de nuevo en 10 segundos.")